@@ -4,12 +4,37 @@ Playing around with wordlist
 
 import argparse
 import re
+import struct
 import collections
+import functools
 import pathlib
 import logging
+import os
 import itertools
 import json
+import pickle
 import sys
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+from numba import njit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj):
+    """
+    Serialises obj as JSON with an indent of 2, using orjson if it is installed
+    :param obj: object to serialise
+    :return: UTF-8 encoded bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode()
 
 
 class Wordle:
@@ -17,14 +42,18 @@ class Wordle:
     Simple class to represent the number of letters in the same position in a word and the
     number which are common but not in the right position.
     """
+    __slots__ = ("position", "common")
 
-    def __init__(self):
-        self.position = 0
-        self.common = 0
+    def __init__(self, position=0, common=0):
+        self.position = position
+        self.common = common
 
     def __repr__(self):
         return f"({self.position:,}/{self.common:,})"
 
+    def __reduce__(self):
+        return Wordle, (self.position, self.common)
+
     def asDict(self):
         return {"position": self.position, "common": self.common}
 
@@ -33,13 +62,22 @@ class Word:
     """
     A word from the list
     """
+    __slots__ = ("original", "word", "acronym", "proper", "palindrome", "counts", "anagrams", "subwords", "wordle")
+
     def __init__(self, word):
         assert isinstance(word, str), "Word must be a string"
         self.original = word
         self.word = word.casefold()
-        self.proper = word[0].isupper()
+        assert self.word.isascii() and self.word.isalpha(), "Word must only contain the letters a-z"
+        # The word is plain ASCII, so the case checks can be done on the bytes
+        raw = word.encode("ascii")
+        self.acronym = raw.isupper()
+        self.proper = not self.acronym and raw[:1].isupper()
         self.palindrome = self.word == self.word[::-1]
-        self.counts = collections.Counter(self.word)
+        counts = bytearray(26)
+        for letter in self.word:
+            counts[ord(letter) - ord("a")] += 1
+        self.counts = bytes(counts)
         self.anagrams = []
         self.subwords = []
         self.wordle = Wordle()
@@ -51,6 +89,10 @@ class Word:
     def __repr__(self):
         return f"Word('{self.word}')"
 
+    def __reduce__(self):
+        # Everything else is derived from the original word, so is recalculated rather than pickled
+        return Word, (self.original,), (None, {"anagrams": self.anagrams, "subwords": self.subwords, "wordle": self.wordle})
+
     def isAnagram(self, other):
         """
         Are self and other anagrams of each other?
@@ -65,7 +107,7 @@ class Word:
         :param other:
         :return: boolean
         """
-        return all(self.counts[letter] >= other.counts[letter] for letter in other.counts)
+        return all(a >= b for a, b in zip(self.counts, other.counts))
 
     def wordleScore(self, other):
         """
@@ -76,66 +118,489 @@ class Word:
         """
         if len(self) == len(other):
             self.wordle.position += sum(1 for i in range(len(self.word)) if self.word[i] == other.word[i])
-            self.wordle.common += sum(min(self.counts[letter], other.counts[letter]) for letter in self.counts)
+            self.wordle.common += sum(min(a, b) for a, b in zip(self.counts, other.counts))
     def asDict(self):
         return {
             "original": self.original,
             "word": self.word,
+            "acronym": self.acronym,
             "proper": self.proper,
             "palindrome": self.palindrome,
-            "counts": dict(self.counts),
+            "counts": {chr(ord("a") + i): count for i, count in enumerate(self.counts) if count},
             "anagrams": [token.word for token in self.anagrams],
-            "subwords": [token.word for token in self.anagrams],
+            "subwords": [token.word for token in self.subwords],
             "wordle": self.wordle.asDict(),
         }
 
+# Nibble masks for the packed letter counts. They need to be uint64 so that Numba doesn't promote the
+# arithmetic on the packed words to signed integers or floats.
+_HIGH = np.uint64(0x8888888888888888)
+_NIBBLE = np.uint64(0xF)
+_LOW = np.uint64(0x0F0F0F0F0F0F0F0F)
+_BYTES = np.uint64(0x0101010101010101)
+
+
+def _packCounts(counts):
+    """
+    Packs a matrix of letter counts into two uint64s per word, a-p in the first and q-z in the
+    second, with four bits per letter. Only meaningful if no count is greater than 7 since the top
+    bit of each nibble is used as a guard bit when the packed counts are compared.
+    :param counts: (N, 26) uint8 array of letter counts
+    :return: (N, 2) uint64 array
+    """
+    shifts = np.arange(16, dtype=np.uint64) * np.uint64(4)
+    wide = counts.astype(np.uint64)
+    packed = np.zeros((len(counts), 2), dtype=np.uint64)
+    packed[:, 0] = np.bitwise_or.reduce(wide[:, :16] << shifts, axis=1)
+    packed[:, 1] = np.bitwise_or.reduce(wide[:, 16:] << shifts[:10], axis=1)
+    return packed
+
+
+@njit(cache=True)
+def _packedCommon(a, b):
+    """
+    Sums the lane by lane minimum of two packed sets of letter counts
+    :param a: uint64 of packed counts
+    :param b: uint64 of packed counts
+    :return: the total as an int64
+    """
+    # The guard bit survives the subtraction in exactly those lanes where a >= b
+    ge = (((a | _HIGH) - b) & _HIGH) >> np.uint64(3)
+    mask = ge * _NIBBLE
+    low = (b & mask) | (a & ~mask)
+    # Add adjacent nibbles into bytes, then add the bytes up into the top byte
+    low = (low & _LOW) + ((low >> np.uint64(4)) & _LOW)
+    return np.int64((low * _BYTES) >> np.uint64(56))
+
+
+# Not parallel=True as the kernel is only run in the worker processes, which already use every core
+@njit(cache=True)
+def _scoreBin(codes, counts, packed, outPosition, outCommon, block, start, stop):
+    """
+    Compiled kernel which compares the words in rows start to stop of a bin with every word in the
+    bin. The comparison is done in square tiles of block x block words so that the rows being worked
+    on stay in cache. If the packed counts are supplied the letters in common are worked out from
+    them, a word at a time, rather than letter by letter.
+    :param codes: (N, L) uint8 array of letter codes
+    :param counts: (N, 26) uint8 array of letter counts
+    :param packed: (N, 2) uint64 array of packed letter counts, or an empty array to use counts. Must
+                   only be supplied if no letter count in the bin is greater than 7, as the packed
+                   comparison gives the wrong answer otherwise.
+    :param outPosition: (N,) int64 array for the number of letters in the same position
+    :param outCommon: (N,) int64 array for the number of letters in common
+    :param block: number of words along each side of a tile
+    :param start: first row to score
+    :param stop: row after the last one to score
+    :return: None
+    """
+    n, length = codes.shape
+    usePacked = packed.shape[0] == n
+    for ii in range(start, stop, block):
+        for jj in range(0, n, block):
+            for i in range(ii, min(ii + block, stop)):
+                position = 0
+                common = 0
+                for j in range(jj, min(jj + block, n)):
+                    if i == j:
+                        continue
+                    for k in range(length):
+                        if codes[i, k] == codes[j, k]:
+                            position += 1
+                    if usePacked:
+                        common += _packedCommon(packed[i, 0], packed[j, 0]) + _packedCommon(packed[i, 1], packed[j, 1])
+                    else:
+                        for k in range(26):
+                            a = counts[i, k]
+                            b = counts[j, k]
+                            common += a if a < b else b
+                outPosition[i] += position
+                outCommon[i] += common
+
+
+def _toShared(array):
+    """
+    Copies an array into a new block of shared memory
+    :param array: NumPy array
+    :return: (SharedMemory, (name, shape, dtype)), the block and a description of the array in it
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _fromShared(block, description):
+    """
+    Wraps an array in a block of shared memory. The block can't be closed until the array has gone.
+    :param block: SharedMemory
+    :param description: (name, shape, dtype) of the array
+    :return: NumPy array
+    """
+    _, shape, dtype = description
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def processBin(task):
+    """
+    Works out the wordle scores for a tile of rows of a bin of words which are all the same length,
+    comparing them with every word in the bin. The arrays are passed as (name, shape, dtype)
+    descriptions of blocks of shared memory so that only the names need to be pickled to a worker
+    process.
+    :param task: (length, codes, counts, packed, scores, start, stop) where
+                 length is the length of the words in the bin, L,
+                 codes is an (N, L) uint8 array of letter codes,
+                 counts is an (N, 26) uint8 array of letter counts,
+                 packed is an (N, 2) uint64 array of packed letter counts, or empty (see _scoreBin),
+                 scores is a (2, N) int64 array, filled in with the number of letters in the same
+                 position and the number in common, and
+                 start and stop are the rows to score
+    :return: (L, number of rows scored)
+    """
+    length, *descriptions, start, stop = task
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in descriptions]
+    try:
+        _processBin(*(_fromShared(block, description) for block, description in zip(blocks, descriptions)), start, stop)
+    finally:
+        for block in blocks:
+            block.close()
+    return length, stop - start
+
+
+def _processBin(codes, counts, packed, scores, start, stop):
+    """
+    Does the work for processBin once the arrays have been attached, comparing the letter codes and
+    letter counts of each pair of words in a compiled kernel
+    """
+    length = codes.shape[1]
+    # Size the tiles so that both sides' codes and counts fit comfortably in a 32k L1 cache
+    _scoreBin(codes, counts, packed, scores[0], scores[1], min(128, 32768 // (length + 26)), start, stop)
+
+
+@functools.lru_cache(maxsize=8)
+def _wordre(minlen):
+    """
+    Compiles the regular expression for words of at least minlen letters. It is matched against the
+    whole file at once, allowing for DOS line endings.
+    :param minlen: minimum word length
+    :return: compiled bytes regular expression
+    """
+    return re.compile(rb"(?m)^([a-zA-Z]{" + str(minlen).encode() + rb",})\r?$")
+
+
+# Bins with fewer words than this are scored in Python rather than by the worker processes
+_SMALL_BIN = 64
+
+
+def _flatten(lists):
+    """
+    Packs a list of lists of indices into a flat array of the indices and an array of offsets
+    :param lists: list of lists of ints
+    :return: (indices, offsets) where list i is indices[offsets[i]:offsets[i + 1]]
+    """
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(indices) for indices in lists])
+    return np.fromiter(itertools.chain.from_iterable(lists), dtype=np.int32, count=offsets[-1]), offsets
+
+
+def _unflatten(indices, offsets):
+    """
+    Reverses _flatten
+    :param indices: flat array of indices
+    :param offsets: array of offsets into indices
+    :return: generator of lists of ints
+    """
+    indices, offsets = indices.tolist(), offsets.tolist()
+    return (indices[start:end] for start, end in zip(offsets, offsets[1:]))
+
+
 class WordList:
     """
     WordList is (basically) a wrapper round a dictionary of Word objects with some additional methods
     """
 
-    def __init__(self, source, minlen=3, pagination=1_000_000):
-        wordre = re.compile("^[a-zA-Z]{"+str(minlen)+",}$")
-
+    def __init__(self, source, minlen=3, pagination=1_000_000, workers=None, tileComparisons=1_000_000):
         self.source = source
+        self.minlen = minlen
         self.wordpath = pathlib.Path(source)
         if not (self.wordpath.exists() and self.wordpath.is_file()):
             raise FileNotFoundError(f"File not found: {source}")
-        self.words = {line: Word(line) for line in self.wordpath.read_text().splitlines() if wordre.match(line)}
+        lines = dict.fromkeys(match.decode("ascii") for match in _wordre(minlen).findall(self.wordpath.read_bytes()))
+        # All the words are held in one list, in order, which the dictionaries refer into
+        self._wordList = [Word(line) for line in lines]
+        self.words = {word.original: word for word in self._wordList}
         logging.debug(f"Read {len(self.words):,} words from {self.wordpath.name}")
 
-        for i, (a, b) in enumerate(itertools.combinations(self.words.values(), 2), 1):
-            if i % pagination == 0:
-                logging.debug(f"{i:,} {a.word} :  {b.word}")
-            if a.isAnagram(b):
-                a.anagrams.append(b)
-                b.anagrams.append(a)
-            elif a.isSubword(b):
-                a.subwords.append(b)
-            elif b.isSubword(a):
-                b.subwords.append(a)
-            a.wordleScore(b)
-            b.wordleScore(a)
+        self.bins = self._binWords(self.words)
+        counts = {length: np.frombuffer(b"".join(word.counts for word in bin.values()), dtype=np.uint8).reshape(len(bin), 26)
+                  for length, bin in self.bins.items()}
+        self.processBins(counts, workers, tileComparisons, pagination)
+
+        # Anagrams are always the same length, so only words in different bins can be subwords
+        done = 0
+        for short, long in itertools.combinations(sorted(self.bins), 2):
+            done = self.findSubwords(self.bins[long], counts[long], self.bins[short], counts[short],
+                                     tileComparisons, pagination, done)
+
+    def processBins(self, counts, workers=None, tileComparisons=1_000_000, pagination=1_000_000):
+        """
+        Works out the anagrams and wordle scores for each bin. The wordle scores are worked out by a
+        pool of worker processes, with each bin split into tiles of rows making roughly tileComparisons
+        word comparisons so that the big bins are spread across the workers. The arrays for each bin are
+        built here and shared with the workers rather than pickled. Bins smaller than _SMALL_BIN are
+        scored here in Python, as setting them up for the workers would cost more than scoring them.
+        :param counts: dictionary of length to (N, 26) uint8 array of letter counts for that bin
+        :param workers: number of worker processes
+        :param tileComparisons: number of word comparisons in each tile
+        :param pagination: number of word comparisons between progress messages
+        :return: None
+        """
+        for length, bin in self.bins.items():
+            self.findAnagrams(bin, counts[length])
+
+        shared = {}
+        try:
+            tasks = []
+            remaining = {}
+            for length in sorted(self.bins):
+                bin = self.bins[length]
+                if len(bin) < _SMALL_BIN:
+                    self.scoreSmallBin(bin)
+                    continue
+                codes = np.frombuffer(b"".join(word.word.encode() for word in bin.values()), dtype=np.uint8)
+                # The packed counts are only usable if no letter appears more than 7 times in a word
+                packed = _packCounts(counts[length]) if counts[length].max() <= 7 else np.zeros((0, 2), dtype=np.uint64)
+                shared[length] = [_toShared(array) for array in
+                                  (codes.reshape(len(bin), length), counts[length], packed, np.zeros((2, len(bin)), dtype=np.int64))]
+                descriptions = [description for _, description in shared[length]]
+                tile = max(1, tileComparisons // len(bin))
+                tasks += [(length, *descriptions, start, min(start + tile, len(bin))) for start in range(0, len(bin), tile)]
+                remaining[length] = len(bin)
+
+            if not tasks:
+                return
+            processes = workers or os.cpu_count()
+            with multiprocessing.Pool(processes) as pool:
+                chunksize = max(1, len(tasks) // (4 * processes))
+                done = 0
+                for length, rows in pool.imap_unordered(processBin, tasks, chunksize=chunksize):
+                    before, done = done, done + rows * len(self.bins[length])
+                    if done // pagination > before // pagination:
+                        logging.debug(f"{done:,} comparisons, latest on words of length {length}")
+                    remaining[length] -= rows
+                    if remaining[length]:
+                        continue
+                    positions, commons = _fromShared(*shared[length][3]).tolist()
+                    for word, position, common in zip(self.bins[length].values(), positions, commons):
+                        word.wordle.position = position
+                        word.wordle.common = common
+                    logging.debug(f"Processed {len(positions):,} words of length {length}")
+        finally:
+            for blocks in shared.values():
+                for block, _ in blocks:
+                    block.close()
+                    block.unlink()
+
+    @staticmethod
+    def scoreSmallBin(bin):
+        """
+        Works out the wordle scores for a bin of words which are all the same length by calling
+        wordleScore on every pair of words
+        :param bin: dictionary of Word objects, all the same length
+        :return: None
+        """
+        words = list(bin.values())
+        for i in range(len(words)):
+            a = words[i]
+            for j in range(i + 1, len(words)):
+                b = words[j]
+                a.wordleScore(b)
+                b.wordleScore(a)
+
+    @staticmethod
+    def _binWords(words):
+        """
+        Groups words by length
+        :param words: dictionary of Word objects
+        :return: dictionary of length to dictionary of the Word objects of that length
+        """
+        bins = collections.defaultdict(dict)
+        for line, word in words.items():
+            bins[len(word)][line] = word
+        return bins
+
+    @staticmethod
+    def findAnagrams(bin, counts):
+        """
+        Sets the anagrams of each word in a bin. The rows of letter counts are sorted so that anagrams
+        end up next to each other, and each run of identical rows is a group of anagrams.
+        :param bin: dictionary of Word objects, all the same length
+        :param counts: (N, 26) uint8 array of letter counts for bin
+        :return: None
+        """
+        words = list(bin.values())
+        order = np.lexsort(counts.T[::-1])
+        ordered = counts[order]
+        same = (ordered[1:] == ordered[:-1]).all(axis=1)
+        edges = np.diff(np.concatenate(([False], same, [False])).astype(np.int8))
+        # A run of matches between neighbouring rows covers the rows from its start to one past its end
+        for start, end in zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()):
+            group = [words[i] for i in order[start:end + 1].tolist()]
+            for word in group:
+                word.anagrams = [other for other in group if other is not word]
+
+    @staticmethod
+    def findSubwords(long, longCounts, short, shortCounts, tileComparisons=1_000_000, pagination=1_000_000, done=0):
+        """
+        Adds each word in short whose letters are all present in a word in long to that word's subwords.
+        The letter counts are compared with NumPy a tile of long words at a time, each tile making
+        roughly tileComparisons word comparisons.
+        :param long: dictionary of the longer Word objects
+        :param longCounts: (N, 26) uint8 array of letter counts for long
+        :param short: dictionary of the shorter Word objects
+        :param shortCounts: (M, 26) uint8 array of letter counts for short
+        :param tileComparisons: number of word comparisons in each tile
+        :param pagination: number of word comparisons between progress messages
+        :param done: number of word comparisons already made, for the progress messages
+        :return: done plus the number of word comparisons made here
+        """
+        longWords, shortWords = list(long.values()), list(short.values())
+        tile = max(1, tileComparisons // len(shortWords))
+        for i0 in range(0, len(longWords), tile):
+            mask = (shortCounts[None, :, :] <= longCounts[i0:i0 + tile, None, :]).all(axis=2)
+            for i, j in zip(*(axis.tolist() for axis in np.nonzero(mask))):
+                longWords[i0 + i].subwords.append(shortWords[j])
+            before, done = done, done + mask.size
+            if done // pagination > before // pagination:
+                logging.debug(f"{done:,} {longWords[i0 + len(mask) - 1].word} :  {shortWords[-1].word}")
+        logging.debug(f"Compared {len(longWords):,} words of length {len(longWords[0])} with "
+                      f"{len(shortWords):,} words of length {len(shortWords[0])}")
+        return done
 
     def __repr__(self):
         return f"WordList({self.source} ({len(self.words):,} words)"
 
+    def __reduce__(self):
+        # Pickled column by column, with the anagrams and subwords as indexes into the list of words,
+        # rather than as a graph of Word objects
+        words = self._wordList
+        index = {word.original: i for i, word in enumerate(words)}
+        return WordList._restore, (
+            self.source, self.minlen, [word.original for word in words],
+            np.array([word.wordle.position for word in words], dtype=np.int64),
+            np.array([word.wordle.common for word in words], dtype=np.int64),
+            _flatten([[index[other.original] for other in word.anagrams] for word in words]),
+            _flatten([[index[other.original] for other in word.subwords] for word in words]),
+        )
+
+    @classmethod
+    def _restore(cls, source, minlen, originals, positions, commons, anagrams, subwords):
+        """
+        Rebuilds a pickled WordList without rereading or reprocessing the source
+        :return: WordList
+        """
+        self = cls.__new__(cls)
+        self.source = source
+        self.minlen = minlen
+        self.wordpath = pathlib.Path(source)
+        words = [Word(original) for original in originals]
+        for word, position, common, anagramIndices, subwordIndices in zip(
+                words, positions.tolist(), commons.tolist(), _unflatten(*anagrams), _unflatten(*subwords)):
+            word.wordle = Wordle(position, common)
+            word.anagrams = [words[i] for i in anagramIndices]
+            word.subwords = [words[i] for i in subwordIndices]
+        self._wordList = words
+        self.words = {word.original: word for word in words}
+        self.bins = self._binWords(self.words)
+        return self
+
     def asDict(self):
         return {word: value.asDict() for word, value in self.words.items()}
+
+    def writeJSON(self, outfile):
+        """
+        Writes the same JSON as dumping asDict() with an indent of 2 would, but a word at a time so
+        that only one word's dictionary is in memory at once
+        :param outfile: binary file to write to
+        :return: None
+        """
+        outfile.write(b"{")
+        for i, (word, value) in enumerate(self.words.items()):
+            body = _dumps(value.asDict()).replace(b"\n", b"\n  ")
+            outfile.write((b"," if i else b"") + b"\n  " + _dumps(word) + b": " + body)
+        outfile.write(b"\n}" if self.words else b"}")
+
+
+def dump(obj, outfile):
+    """
+    Pickles obj with protocol 5. Buffers which support it, such as the NumPy arrays in a pickled
+    WordList, are written out of band after the pickle rather than being copied into it.
+    :param obj: object to pickle
+    :param outfile: binary file to write to
+    :return: None
+    """
+    buffers = []
+    data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    outfile.write(struct.pack("<QQ", len(data), len(buffers)))
+    outfile.write(data)
+    for buffer in buffers:
+        raw = buffer.raw()
+        outfile.write(struct.pack("<Q", raw.nbytes))
+        outfile.write(raw)
+
+
+def load(infile):
+    """
+    Reverses dump
+    :param infile: binary file to read from
+    :return: the unpickled object
+    """
+    size, count = struct.unpack("<QQ", _readExactly(infile, 16))
+    data = _readExactly(infile, size)
+    buffers = []
+    for _ in range(count):
+        (size,) = struct.unpack("<Q", _readExactly(infile, 8))
+        buffers.append(_readExactly(infile, size))
+    return pickle.loads(data, buffers=buffers)
+
+
+def _readExactly(infile, size):
+    """
+    Reads exactly size bytes from a binary file
+    :param infile: binary file to read from
+    :param size: number of bytes to read
+    :return: bytearray
+    :raises EOFError: if the file ends first
+    """
+    buffer = bytearray(size)
+    read = infile.readinto(buffer)
+    if read != size:
+        raise EOFError(f"Expected {size:,} bytes but only got {read:,}, file is truncated")
+    return buffer
+
+
 if __name__ == "__main__":
     ap = argparse.ArgumentParser(description="Playing with words")
     ap.add_argument("-v", "--verbose", action="count", default=0, help="Increase verbosity")
-    ap.add_argument("-o", "--output", help="Output JSON filename", default="words.json", type=str)
+    ap.add_argument("-o", "--output", help="Output filename (default words.json or words.pkl)", type=str)
+    ap.add_argument("-f", "--format", help="Output format", choices=["json", "pickle"], default="json")
     ap.add_argument("source", help="Source word list")
     args = ap.parse_args()
     levels = [logging.WARNING, logging.INFO, logging.DEBUG]
     logging.basicConfig(level=levels[min(args.verbose, len(levels)-1)],
                         format="%(asctime)s %(levelname)s %(message)s")
+    if args.output is None:
+        args.output = "words.pkl" if args.format == "pickle" else "words.json"
+    # Use the classes from the words module rather than __main__, so that pickles refer to words.WordList
+    # and can be loaded elsewhere. This imports this file a second time, under its module name, so it
+    # only works while the file is called words.py (its directory is already on sys.path as the script's).
+    from words import WordList, dump
     try:
         words = WordList(args.source)
-        with open(args.output, "w") as outfile:
+        with open(args.output, "wb") as outfile:
             logging.debug(f"Writing to {args.output}")
-            json.dump(words.asDict(), outfile, indent=4)
+            if args.format == "pickle":
+                dump(words, outfile)
+            else:
+                words.writeJSON(outfile)
     except FileNotFoundError:
         print(f"File not found: {args.source}")
         sys.exit(0)